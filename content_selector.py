@@ -9,20 +9,39 @@ import sqlite3
 import logging
 import datetime
 import json
-import traceback
-from typing import List, Dict, Any, Tuple
-
-# Configuration du logging
-logging.basicConfig(
-    level=logging.DEBUG,  # Changé de INFO à DEBUG pour plus de détails
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("content_selector.log"),
-        logging.StreamHandler()
-    ]
-)
+import calendar
+import functools
+import atexit
+import pathlib
+import queue
+import contextlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Tuple, Optional, Iterable
+
+try:
+    import orjson  # Sérialisation JSON plus rapide si disponible
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger("content_selector")
 
+def configure_logging(level=logging.INFO):
+    """
+    Configure le logging du module lorsqu'il est exécuté directement.
+    
+    Appelée depuis __main__ uniquement : importer le module (depuis le script
+    principal ou un test) n'ouvre donc pas de fichier de log.
+    """
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler("content_selector.log"),
+            logging.StreamHandler()
+        ]
+    )
+
 # Constantes pour les seuils de sélection (abaissés pour le diagnostic)
 MIN_ENGAGEMENT_SCORE = 0.01  # Seuil minimum de score d'engagement
 MIN_VIEWS = 1              # Seuil minimum de vues pour les vidéos/reels
@@ -32,91 +51,547 @@ RECENCY_DAYS_LIMIT = 14    # Limite en jours pour considérer un contenu comme r
 # Chemin de la base de données
 DB_PATH = "content_database.db"
 
+# Réglages SQLite appliqués à l'ouverture de chaque connexion :
+# journal WAL (lecteurs non bloqués par l'écrivain, commits sans fsync du journal),
+# cache de pages de 64 Mo, tables temporaires en mémoire et lecture via mmap.
+# Les écritures concurrentes (sélection multi-threads) attendent le verrou jusqu'à 30 s.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -65536,
+    "temp_store": "MEMORY",
+    "mmap_size": 268435456,
+    "busy_timeout": 30000,
+}
+
+# Nombre de posts scrapés accumulés avant chaque écriture en lot
+SCRAPED_CONTENT_BATCH_SIZE = 500
+
+# Champs des posts scrapés déjà stockés dans des colonnes de la table content
+# (les autres champs, ex. légende, commentaires, media_url, sont conservés dans metadata)
+POST_COLUMN_KEYS = frozenset({
+    "url", "link", "type", "date", "timestamp", "platform", "username",
+    "engagement_score", "is_speaking", "has_captions", "has_music", "metadata",
+})
+
+# Bits des caractéristiques d'un contenu (et des préférences correspondantes d'un modèle)
+FLAG_SPEAKING = 1
+FLAG_CAPTIONS = 2
+FLAG_MUSIC = 4
+
+# Nombre maximal de modèles traités en parallèle par select_content_for_all_models
+MAX_SELECTION_WORKERS = 8
+
+# Version du schéma enregistrée dans PRAGMA user_version (à incrémenter à chaque migration)
+SCHEMA_VERSION = 2
+
+# Version minimale de SQLite requise par le schéma (colonne générée trends.date_bucket)
+MIN_SQLITE_VERSION = (3, 31, 0)
+
+# Réglages appliqués aux connexions en lecture seule (le mode WAL est déjà fixé par l'écrivain)
+SQLITE_READER_PRAGMAS = {name: value for name, value in SQLITE_PRAGMAS.items() if name != "journal_mode"}
+
+# Au-delà de ce nombre de lignes, un chargement en lot supprime puis reconstruit
+# les index secondaires de la table content plutôt que de les maintenir ligne à ligne
+BULK_INDEX_REBUILD_THRESHOLD = 10000
+CONTENT_SECONDARY_INDEXES = ("idx_content_model_selected_ts",)
+
+# Nombre maximal d'identifiants par clause IN (...) (SQLITE_MAX_VARIABLE_NUMBER vaut 999
+# sur les anciennes versions de SQLite, un paramètre étant réservé à la date)
+SQLITE_MAX_IN_PARAMS = 900
+
+# Nombre maximal de connexions conservées par pool (écriture et lecture, par base) ;
+# les connexions rendues au-delà sont fermées
+SQLITE_POOL_SIZE = 8
+
+# Taille du cache de requêtes préparées de sqlite3 (100 par défaut)
+SQLITE_CACHED_STATEMENTS = 256
+
+# Requêtes SQL fixes : le texte identique d'un appel à l'autre permet au cache
+# de requêtes préparées de sqlite3 d'éviter une nouvelle analyse à chaque exécution.
+_SQL_SEED_PREFERENCES = "INSERT OR IGNORE INTO model_preferences (model_name) VALUES (?)"
+_SQL_SEED_STATS = "INSERT OR IGNORE INTO model_stats (model_name) VALUES (?)"
+
+# Upsert du contenu (paramètres numérotés, réutilisés dans la mise à jour). Pour un lien déjà
+# connu, le modèle, le type et l'état de sélection sont conservés ; les caractéristiques et
+# métadonnées inconnues (NULL) n'écrasent pas les valeurs déjà enregistrées.
+_SQL_UPSERT_CONTENT = '''
+INSERT INTO content (
+    model_name, link, content_type, platform, extraction_date, extraction_ts,
+    performance_metric, engagement_score, is_speaking, has_captions,
+    has_music, metadata
+) VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, COALESCE(?9, 0), COALESCE(?10, 0), COALESCE(?11, 0), COALESCE(?12, '{}'))
+ON CONFLICT(link) DO UPDATE SET
+    platform = excluded.platform,
+    extraction_date = excluded.extraction_date,
+    extraction_ts = excluded.extraction_ts,
+    performance_metric = excluded.performance_metric,
+    engagement_score = excluded.engagement_score,
+    is_speaking = COALESCE(?9, is_speaking),
+    has_captions = COALESCE(?10, has_captions),
+    has_music = COALESCE(?11, has_music),
+    metadata = COALESCE(?12, metadata)
+'''
+
+# Une tendance est unique par plateforme, type, élément et jour d'extraction (date_bucket)
+_SQL_UPSERT_TREND = '''
+INSERT INTO trends (platform, content_type, item, rank, extraction_date)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(platform, content_type, item, date_bucket) DO UPDATE SET
+    rank = COALESCE(excluded.rank, rank)
+'''
+
+_SQL_SELECT_PREFERENCES = "SELECT prefers_speaking, prefers_captions, prefers_music FROM model_preferences WHERE model_name = ?"
+_SQL_SELECT_STATS = "SELECT avg_reel_views FROM model_stats WHERE model_name = ?"
+_SQL_UPSERT_PREFERENCES = '''
+INSERT INTO model_preferences (model_name, prefers_speaking, prefers_captions, prefers_music)
+VALUES (?, ?, ?, ?)
+ON CONFLICT(model_name) DO UPDATE SET
+    prefers_speaking = excluded.prefers_speaking,
+    prefers_captions = excluded.prefers_captions,
+    prefers_music = excluded.prefers_music
+'''
+_SQL_UPSERT_STATS = '''
+INSERT INTO model_stats (model_name, avg_reel_views) VALUES (?, ?)
+ON CONFLICT(model_name) DO UPDATE SET avg_reel_views = excluded.avg_reel_views
+'''
+
+_SQL_SELECT_CANDIDATES = '''
+SELECT id, link, content_type, platform, performance_metric, engagement_score,
+       is_speaking, has_captions, has_music, metadata
+FROM content
+WHERE model_name = ? AND selected = 0 AND extraction_ts >= ?
+ORDER BY extraction_ts DESC, engagement_score DESC
+'''
+_SQL_MARK_SELECTED = "UPDATE content SET selected = 1, selection_date = ? WHERE id IN ({placeholders})"
+
+def _preference_masks(preferences: Dict[str, bool]) -> Tuple[int, int]:
+    """
+    Convertit les préférences d'un modèle en masques de bits (requis, interdits).
+    
+    Un modèle exige les caractéristiques qu'il préfère ; il refuse la parole et la
+    musique lorsqu'il ne les préfère pas (l'absence de sous-titres reste acceptée).
+    Sans préférences connues, aucun contenu n'est filtré.
+    """
+    if not preferences:
+        return 0, 0
+    want_mask = ((FLAG_SPEAKING if preferences.get('prefers_speaking') else 0)
+                 | (FLAG_CAPTIONS if preferences.get('prefers_captions') else 0)
+                 | (FLAG_MUSIC if preferences.get('prefers_music') else 0))
+    must_not_mask = (FLAG_SPEAKING | FLAG_MUSIC) & ~want_mask
+    return want_mask, must_not_mask
+
+# Motifs de rejet (dans l'ordre des vérifications) : caractéristique préférée absente,
+# puis caractéristique non préférée présente
+_MISSING_FEATURE_REASONS = (
+    (FLAG_SPEAKING, "Le modèle préfère parler, ce contenu ne parle pas."),
+    (FLAG_CAPTIONS, "Le modèle préfère les sous-titres, ce contenu n'en a pas."),
+    (FLAG_MUSIC, "Le modèle préfère la musique, ce contenu n'en a pas."),
+)
+_FORBIDDEN_FEATURE_REASONS = (
+    (FLAG_SPEAKING, "Le modèle ne préfère pas parler, ce contenu parle."),
+    (FLAG_MUSIC, "Le modèle ne préfère pas la musique, ce contenu en a."),
+)
+
+def _preference_rejection_reason(missing: int, forbidden: int) -> str:
+    """Motif du rejet d'un contenu à partir des bits manquants et interdits."""
+    for flag, reason in _MISSING_FEATURE_REASONS:
+        if missing & flag:
+            return reason
+    for flag, reason in _FORBIDDEN_FEATURE_REASONS:
+        if forbidden & flag:
+            return reason
+    return "Caractéristiques incompatibles avec les préférences du modèle."
+
+@functools.lru_cache(maxsize=64)
+def _mark_selected_sql(count: int) -> str:
+    """Texte SQL de marquage pour un nombre d'identifiants donné (texte identique => requête préparée réutilisée)."""
+    return _SQL_MARK_SELECTED.format(placeholders=",".join("?" * count))
+
+def _dump_metadata(metadata) -> str:
+    """
+    Sérialise les métadonnées en JSON compact (sans espaces) pour réduire la taille des lignes.
+    
+    orjson produit le même texte que json (dates via str()), sauf pour NaN/Infinity
+    écrits null. Les clés non textuelles, refusées par orjson, passent par json.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(metadata, default=str, option=orjson.OPT_PASSTHROUGH_DATETIME).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(metadata, separators=(',', ':'), ensure_ascii=False, default=str)
+
+def _load_metadata(metadata_json) -> Dict[str, Any]:
+    """
+    Désérialise les métadonnées JSON stockées (dictionnaire vide si absentes ou illisibles).
+    
+    Les NaN/Infinity écrits par json.dumps, refusés par orjson, sont relus avec json.
+    """
+    if not metadata_json:
+        return {}
+    if orjson is not None:
+        try:
+            return orjson.loads(metadata_json)
+        except orjson.JSONDecodeError:
+            pass
+    try:
+        return json.loads(metadata_json)
+    except ValueError:
+        logger.warning(f"Métadonnées JSON illisibles ignorées: {metadata_json[:100]!r}")
+        return {}
+
+def _flag(value) -> Optional[int]:
+    """Convertit une caractéristique booléenne en 0/1 (None si elle n'est pas renseignée)."""
+    if value is None:
+        return None
+    return 1 if value else 0
+
+def _to_timestamp(value) -> Optional[int]:
+    """
+    Convertit une date ISO 8601 (ou un datetime) en timestamp Unix entier.
+    
+    Les dates sans fuseau horaire sont interprétées en UTC, comme strftime('%s')
+    de SQLite, pour rester comparables aux valeurs migrées directement en SQL.
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime.datetime):
+        return None
+    return calendar.timegm(value.utctimetuple())
+
+# Connexions conservées entre les instances de ContentSelector, par chemin absolu de base
+# (cache de pages SQLite déjà chaud, réglages déjà appliqués)
+_WRITER_POOLS: Dict[str, queue.SimpleQueue] = {}
+_READER_POOLS: Dict[str, queue.SimpleQueue] = {}
+_POOLS_LOCK = threading.Lock()
+
+# Sérialise la vérification et la migration du schéma entre les threads du processus
+# (ex. premiers ContentSelector des workers de select_content_for_all_models)
+_SCHEMA_LOCK = threading.Lock()
+
+def _get_pool(pools: Dict[str, queue.SimpleQueue], db_path: str) -> queue.SimpleQueue:
+    """Retourne la file de connexions associée à une base (créée au premier appel)."""
+    with _POOLS_LOCK:
+        return pools.setdefault(db_path, queue.SimpleQueue())
+
+def _release_connection(pool: queue.SimpleQueue, conn: sqlite3.Connection):
+    """Rend une connexion à son pool, ou la ferme si le pool est déjà plein (SQLITE_POOL_SIZE)."""
+    if pool.qsize() < SQLITE_POOL_SIZE:
+        pool.put(conn)
+    else:
+        conn.close()
+
+def _drain_pool(pool: queue.SimpleQueue):
+    """Ferme toutes les connexions en attente dans une file."""
+    while True:
+        try:
+            pool.get_nowait().close()
+        except queue.Empty:
+            break
+
+def _forget_database(db_path: str):
+    """Ferme les connexions en pool d'une base et oublie son initialisation (fichier supprimé)."""
+    with _POOLS_LOCK:
+        pools = [pool for pool in (_WRITER_POOLS.pop(db_path, None), _READER_POOLS.pop(db_path, None)) if pool]
+        ContentSelector._initialized_paths.discard(db_path)
+    for pool in pools:
+        _drain_pool(pool)
+
+def close_pooled_connections():
+    """
+    Ferme toutes les connexions conservées dans les pools (à appeler en fin de processus,
+    ou après avoir remplacé un fichier de base encore ouvert par une instance).
+    """
+    with _POOLS_LOCK:
+        pools = list(_WRITER_POOLS.values()) + list(_READER_POOLS.values())
+        _WRITER_POOLS.clear()
+        _READER_POOLS.clear()
+        ContentSelector._initialized_paths.clear()
+    for pool in pools:
+        _drain_pool(pool)
+    logger.debug(f"{len(pools)} pools de connexions fermés")
+
+# Les connexions mises en pool restent ouvertes jusqu'à la fin du processus
+atexit.register(close_pooled_connections)
+
 class ContentSelector:
     """Classe pour gérer la base de données et la sélection de contenu."""
     
-    def __init__(self, db_path=DB_PATH):
-        """Initialise la connexion à la base de données et crée les tables si nécessaire."""
+    # Attributs d'instance fixes (pas de __dict__ par instance, accès plus rapide)
+    __slots__ = ("db_path", "_pooled", "_writer_pool", "_reader_pool", "_pragma_overrides", "conn", "cursor",
+                 "_preferences_cache", "_stats_cache")
+    
+    # Bases déjà initialisées dans ce processus (évite de refaire les vérifications à chaque instance)
+    _initialized_paths = set()
+    
+    def __init__(self, db_path=DB_PATH, pragmas: Optional[Dict[str, Any]] = None):
+        """
+        Initialise la connexion à la base de données et crée les tables si nécessaire.
+        
+        Args:
+            db_path (str): Chemin de la base SQLite.
+            pragmas (dict, optional): Réglages remplaçant ceux de SQLITE_PRAGMAS pour la connexion
+                                      principale de cette instance (ex. {"synchronous": "OFF"}
+                                      pour un import massif). Ils sont rétablis à la fermeture.
+                                      journal_mode, propre au fichier et non à la connexion,
+                                      ne peut pas être remplacé.
+        """
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise sqlite3.NotSupportedError(
+                f"SQLite {sqlite3.sqlite_version} trop ancien (version {'.'.join(map(str, MIN_SQLITE_VERSION))} minimum requise)"
+            )
+        self._pragma_overrides = dict(pragmas or {})
+        unknown = set(self._pragma_overrides) - (set(SQLITE_PRAGMAS) - {"journal_mode"})
+        if unknown:
+            raise ValueError(f"Réglages SQLite non pris en charge: {', '.join(sorted(unknown))}")
+        invalid = [
+            name for name, value in self._pragma_overrides.items()
+            if not (isinstance(value, int) or (isinstance(value, str) and value.isidentifier()))
+        ]
+        if invalid:
+            raise ValueError(f"Valeurs de réglages SQLite invalides (entier ou mot-clé attendu): {', '.join(sorted(invalid))}")
+        # Une base en mémoire est propre à sa connexion: elle n'est jamais mise en pool
+        self._pooled = db_path != ":memory:"
+        # Chemin absolu: "db.sqlite" et "./db.sqlite" partagent les mêmes pools
+        self.db_path = str(pathlib.Path(db_path).resolve()) if self._pooled else db_path
+        if self._pooled and not pathlib.Path(self.db_path).exists():
+            # Fichier supprimé depuis sa dernière ouverture: ses connexions et son état sont périmés
+            _forget_database(self.db_path)
+        self._writer_pool = _get_pool(_WRITER_POOLS, self.db_path) if self._pooled else None
+        # Connexions en lecture seule (ouvertes à la demande, partagées entre les instances)
+        self._reader_pool = _get_pool(_READER_POOLS, self.db_path) if self._pooled else queue.SimpleQueue()
         try:
-            self.conn = sqlite3.connect(db_path)
-            self.cursor = self.conn.cursor()
-            self._create_tables()
+            self.conn = self._acquire_connection()
+            try:
+                if self._pragma_overrides:
+                    self._apply_pragmas(self._pragma_overrides)
+                self._create_tables()
+            except Exception:
+                # Connexion dans un état inconnu: fermée plutôt que rendue au pool
+                self.conn.close()
+                self.conn = None
+                raise
+            # Caches des préférences et statistiques (rarement modifiées, lues à chaque sélection)
+            self._preferences_cache = functools.lru_cache(maxsize=32)(self._load_model_preferences)
+            self._stats_cache = functools.lru_cache(maxsize=32)(self._load_model_stats)
             logger.info(f"Connecté à la base de données: {db_path}")
         except sqlite3.Error as e:
             logger.error(f"Erreur de connexion à la base de données: {e}")
             raise
 
-    def _create_tables(self):
-        """Crée les tables nécessaires dans la base de données si elles n'existent pas."""
+    def _acquire_connection(self) -> sqlite3.Connection:
+        """Reprend une connexion du pool ou en ouvre une nouvelle (avec ses réglages)."""
+        if self._pooled:
+            try:
+                conn = self._writer_pool.get_nowait()
+                self.cursor = conn.cursor()
+                return conn
+            except queue.Empty:
+                pass
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=SQLITE_CACHED_STATEMENTS)
+        conn.row_factory = sqlite3.Row
+        self.cursor = conn.cursor()
+        self._apply_pragmas()
+        return conn
+
+    def _apply_pragmas(self, pragmas: Dict[str, Any] = SQLITE_PRAGMAS):
+        """Applique des réglages SQLite (par défaut ceux de SQLITE_PRAGMAS) à la connexion courante."""
+        for name, value in pragmas.items():
+            self.cursor.execute(f"PRAGMA {name}={value}")
+
+    def _open_reader(self) -> sqlite3.Connection:
+        """Ouvre une connexion en lecture seule sur la base (lecteurs concurrents en mode WAL)."""
+        uri = pathlib.Path(self.db_path).resolve().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=SQLITE_CACHED_STATEMENTS)
+        conn.row_factory = sqlite3.Row
+        for name, value in SQLITE_READER_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    @contextlib.contextmanager
+    def _reader(self):
+        """
+        Fournit une connexion en lecture seule issue du pool (libérée à la sortie du bloc).
+        
+        Une base en mémoire ne peut pas être rouverte: la connexion principale est alors utilisée.
+        """
+        if self.db_path == ":memory:":
+            yield self.conn
+            return
         try:
-            # Table pour stocker le contenu extrait
-            self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS content (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                model_name TEXT NOT NULL,
-                link TEXT UNIQUE NOT NULL,
-                content_type TEXT NOT NULL, -- 'photo', 'video', 'reel', 'tweet', 'thread', 'tiktok'
-                platform TEXT NOT NULL, -- 'instagram', 'twitter', 'threads', 'tiktok'
-                extraction_date TEXT NOT NULL,
-                performance_metric REAL, -- Vues, Likes, etc.
-                engagement_score REAL, -- Score calculé
-                is_speaking INTEGER, -- 0 ou 1
-                has_captions INTEGER, -- 0 ou 1
-                has_music INTEGER, -- 0 ou 1
-                metadata TEXT, -- JSON pour infos supplémentaires (hashtags, sons, etc.)
-                selected INTEGER DEFAULT 0, -- 0: non sélectionné, 1: sélectionné
-                selection_date TEXT
-            )
-            ''')
-            
-            # Table pour stocker les préférences des modèles
-            self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS model_preferences (
-                model_name TEXT PRIMARY KEY,
-                prefers_speaking INTEGER DEFAULT 0,
-                prefers_captions INTEGER DEFAULT 0,
-                prefers_music INTEGER DEFAULT 0
-            )
-            ''')
-            
-            # Table pour stocker les statistiques des modèles (ex: vues moyennes)
+            conn = self._reader_pool.get_nowait()
+        except queue.Empty:
+            conn = self._open_reader()
+        try:
+            yield conn
+        finally:
+            _release_connection(self._reader_pool, conn)
+
+    def _create_tables(self):
+        """
+        Crée les tables et applique les migrations si le schéma n'est pas à jour, puis
+        ajoute les données par défaut et recrée les index éventuellement manquants.
+        """
+        is_file_db = self.db_path != ":memory:"
+        if is_file_db and self.db_path in ContentSelector._initialized_paths:
+            return
+        with _SCHEMA_LOCK:
+            if is_file_db and self.db_path in ContentSelector._initialized_paths:
+                return
+            try:
+                # Verrou d'écriture pris avant de lire la version : un autre processus ne peut
+                # pas appliquer la même migration en parallèle (ALTER TABLE en double)
+                self.cursor.execute("BEGIN IMMEDIATE")
+                schema_outdated = self.cursor.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION
+                if schema_outdated:
+                    self._create_schema()
+                self._seed_defaults()
+                # Index vérifiés à chaque initialisation (une fois par processus) : un index
+                # supprimé (échec d'un chargement massif, DROP INDEX manuel) est ainsi rétabli
+                self._create_indexes()
+                if schema_outdated:
+                    # Mettre à jour les statistiques pour que le planificateur utilise les index
+                    self.cursor.execute("ANALYZE")
+                    self.cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                self.conn.commit()
+                if is_file_db:
+                    ContentSelector._initialized_paths.add(self.db_path)
+                logger.debug("Tables de la base de données vérifiées/créées.")
+            except sqlite3.Error as e:
+                logger.error(f"Erreur lors de la création des tables: {e}")
+                self.conn.rollback()
+                raise
+            except Exception as e:
+                logger.exception(f"Erreur inattendue lors de l'initialisation des tables: {e}")
+                self.conn.rollback()
+                raise
+
+    def _create_schema(self):
+        """Crée les tables et applique les migrations de colonnes."""
+        # Table pour stocker le contenu extrait
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS content (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            model_name TEXT NOT NULL,
+            link TEXT UNIQUE NOT NULL,
+            content_type TEXT NOT NULL, -- 'photo', 'video', 'reel', 'tweet', 'thread', 'tiktok'
+            platform TEXT NOT NULL, -- 'instagram', 'twitter', 'threads', 'tiktok'
+            extraction_date TEXT NOT NULL,
+            performance_metric REAL, -- Vues, Likes, etc.
+            engagement_score REAL, -- Score calculé
+            is_speaking INTEGER, -- 0 ou 1
+            has_captions INTEGER, -- 0 ou 1
+            has_music INTEGER, -- 0 ou 1
+            metadata TEXT, -- JSON pour infos supplémentaires (hashtags, sons, etc.)
+            selected INTEGER DEFAULT 0, -- 0: non sélectionné, 1: sélectionné
+            selection_date TEXT
+        )
+        ''')
+        
+        # Migration : horodatage entier de l'extraction (comparaisons et index plus compacts
+        # que sur la date ISO en texte)
+        if self._add_column_if_missing("content", "extraction_ts", "INTEGER"):
+            # Les dates illisibles prennent l'heure de la migration (sinon extraction_ts resterait
+            # NULL et le contenu ne serait plus jamais sélectionné)
+            self.cursor.execute("SELECT COUNT(*) FROM content WHERE strftime('%s', extraction_date) IS NULL")
+            unparseable = self.cursor.fetchone()[0]
+            if unparseable:
+                logger.warning(f"{unparseable} contenus avec une date d'extraction illisible, datés de la migration")
             self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS model_stats (
-                model_name TEXT PRIMARY KEY,
-                avg_reel_views REAL DEFAULT 0
+            UPDATE content SET extraction_ts = CAST(
+                COALESCE(strftime('%s', extraction_date), strftime('%s', 'now')) AS INTEGER
             )
             ''')
-            
-            # Table pour stocker les tendances
+        
+        # Table pour stocker les préférences des modèles
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS model_preferences (
+            model_name TEXT PRIMARY KEY,
+            prefers_speaking INTEGER DEFAULT 0,
+            prefers_captions INTEGER DEFAULT 0,
+            prefers_music INTEGER DEFAULT 0
+        )
+        ''')
+        
+        # Table pour stocker les statistiques des modèles (ex: vues moyennes)
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS model_stats (
+            model_name TEXT PRIMARY KEY,
+            avg_reel_views REAL DEFAULT 0
+        )
+        ''')
+        
+        # Table pour stocker les tendances
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS trends (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            platform TEXT NOT NULL,
+            content_type TEXT NOT NULL, -- 'hashtag', 'sound'
+            item TEXT NOT NULL,
+            rank INTEGER,
+            extraction_date TEXT NOT NULL,
+            date_bucket TEXT GENERATED ALWAYS AS (date(extraction_date)) VIRTUAL -- 'YYYY-MM-DD' (UTC)
+        )
+        ''')
+        
+        # Migration : jour d'extraction calculé, puis suppression des doublons d'un même jour
+        # avant la création de l'index unique correspondant (la ligne la plus récente, qui
+        # porte le dernier rang, est conservée)
+        if self._add_column_if_missing("trends", "date_bucket",
+                                       "TEXT GENERATED ALWAYS AS (date(extraction_date)) VIRTUAL"):
             self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS trends (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                platform TEXT NOT NULL,
-                content_type TEXT NOT NULL, -- 'hashtag', 'sound'
-                item TEXT NOT NULL,
-                rank INTEGER,
-                extraction_date TEXT NOT NULL
+            DELETE FROM trends WHERE date_bucket IS NOT NULL AND id NOT IN (
+                SELECT MAX(id) FROM trends GROUP BY platform, content_type, item, date_bucket
             )
             ''')
-            
-            # Ajouter les modèles aux tables de préférences et statistiques s'ils n'existent pas
-            # (Utilisé principalement pour l'initialisation)
-            from veille_automatisee import MODELS # Import local pour éviter dépendance circulaire
-            for model in MODELS:
-                self.cursor.execute("INSERT OR IGNORE INTO model_preferences (model_name) VALUES (?)", (model['name'],))
-                self.cursor.execute("INSERT OR IGNORE INTO model_stats (model_name) VALUES (?)", (model['name'],))
-            
-            self.conn.commit()
-            logger.debug("Tables de la base de données vérifiées/créées.")
-        except sqlite3.Error as e:
-            logger.error(f"Erreur lors de la création des tables: {e}")
-            self.conn.rollback()
-            raise
-        except Exception as e:
-            logger.error(f"Erreur inattendue lors de l'initialisation des tables: {e}")
-            logger.error(traceback.format_exc())
-            self.conn.rollback()
-            raise
+            if self.cursor.rowcount:
+                logger.warning(f"{self.cursor.rowcount} tendances en double pour un même jour supprimées")
+
+    def _seed_defaults(self):
+        """Ajoute les modèles aux tables de préférences et statistiques s'ils n'existent pas."""
+        # (Utilisé principalement pour l'initialisation)
+        from veille_automatisee import MODELS # Import local pour éviter dépendance circulaire
+        model_rows = [(model['name'],) for model in MODELS]
+        self.cursor.executemany(_SQL_SEED_PREFERENCES, model_rows)
+        self.cursor.executemany(_SQL_SEED_STATS, model_rows)
+
+    def _create_indexes(self):
+        """Crée les index secondaires manquants (après le chargement des données)."""
+        # Index composites couvrant les requêtes fréquentes
+        # (sélection par modèle et unicité des tendances par jour)
+        self.cursor.execute("DROP INDEX IF EXISTS idx_content_model_selected_date")
+        self._create_content_indexes()
+        self.cursor.execute("DROP INDEX IF EXISTS idx_trends_lookup")
+        self.cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_trends_day
+        ON trends (platform, content_type, item, date_bucket)
+        ''')
+
+    def _create_content_indexes(self):
+        """Crée les index secondaires de la table content (CONTENT_SECONDARY_INDEXES)."""
+        self.cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_content_model_selected_ts
+        ON content (model_name, selected, extraction_ts DESC, engagement_score DESC)
+        ''')
+
+    def _drop_content_indexes(self):
+        """Supprime les index secondaires de la table content (avant un chargement massif)."""
+        for index_name in CONTENT_SECONDARY_INDEXES:
+            self.cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+    def _add_column_if_missing(self, table: str, column: str, definition: str) -> bool:
+        """Ajoute une colonne à une table existante si elle n'y est pas encore. Retourne True si ajoutée."""
+        # table_xinfo liste aussi les colonnes générées, absentes de table_info
+        self.cursor.execute(f"PRAGMA table_xinfo({table})")
+        if any(row["name"] == column for row in self.cursor.fetchall()):
+            return False
+        self.cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        logger.info(f"Colonne {column} ajoutée à la table {table}")
+        return True
 
     def store_content(self, content_item: Dict[str, Any]) -> bool:
         """
@@ -139,52 +614,19 @@ class ContentSelector:
         logger.debug(f"Tentative de stockage du contenu: {link}")
         
         try:
-            # Vérifier si le contenu existe déjà
-            self.cursor.execute("SELECT id FROM content WHERE link = ?", (link,))
-            existing = self.cursor.fetchone()
-            
-            if existing:
-                logger.debug(f"Contenu déjà existant, mise à jour: {link}")
-                # Mettre à jour les métriques si nécessaire (exemple)
-                update_query = "UPDATE content SET extraction_date = ?, performance_metric = ?, engagement_score = ? WHERE link = ?"
-                params = (
-                    content_item.get('extraction_date', datetime.datetime.now().isoformat()),
-                    content_item.get('performance_metric'),
-                    content_item.get('engagement_score'),
-                    link
-                )
-                self.cursor.execute(update_query, params)
-            else:
-                logger.debug(f"Nouveau contenu, insertion: {link}")
-                # Insérer le nouveau contenu
-                insert_query = '''
-                INSERT INTO content (
-                    model_name, link, content_type, platform, extraction_date, 
-                    performance_metric, engagement_score, is_speaking, has_captions, 
-                    has_music, metadata
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                '''
-                params = (
-                    content_item['model_name'],
-                    link,
-                    content_item['content_type'],
-                    content_item['platform'],
-                    content_item.get('extraction_date', datetime.datetime.now().isoformat()),
-                    content_item.get('performance_metric'),
-                    content_item.get('engagement_score'),
-                    1 if content_item.get('is_speaking') else 0,
-                    1 if content_item.get('has_captions') else 0,
-                    1 if content_item.get('has_music') else 0,
-                    json.dumps(content_item.get('metadata', {}))
-                )
-                self.cursor.execute(insert_query, params)
-                
+            row = self._content_row(content_item)
+            if row is None:
+                logger.warning(f"Date d'extraction illisible, ignoré: {link} ({content_item['extraction_date']!r})")
+                return False
+            # Insertion ou mise à jour du contenu en une seule instruction
+            # (voir _SQL_UPSERT_CONTENT pour les colonnes conservées d'un contenu existant)
+            self.cursor.execute(_SQL_UPSERT_CONTENT, row)
             self.conn.commit()
             logger.debug(f"Contenu stocké/mis à jour avec succès: {link}")
             return True
             
         except sqlite3.IntegrityError:
-            logger.warning(f"Erreur d'intégrité (probablement lien dupliqué non détecté initialement): {link}")
+            logger.warning(f"Erreur d'intégrité lors du stockage du contenu: {link}")
             self.conn.rollback()
             return False
         except sqlite3.Error as e:
@@ -192,11 +634,98 @@ class ContentSelector:
             self.conn.rollback()
             return False
         except Exception as e:
-            logger.error(f"Erreur inattendue lors du stockage du contenu {link}: {e}")
-            logger.error(traceback.format_exc())
+            logger.exception(f"Erreur inattendue lors du stockage du contenu {link}: {e}")
             self.conn.rollback()
             return False
 
+    def store_content_batch(self, content_items: List[Dict[str, Any]]) -> int:
+        """
+        Stocke un lot d'éléments de contenu dans une seule transaction.
+
+        Les contenus déjà connus (même lien) sont mis à jour comme avec store_content
+        (voir _SQL_UPSERT_CONTENT pour les colonnes conservées).
+
+        Args:
+            content_items (list): Liste de dictionnaires au format attendu par store_content.
+
+        Returns:
+            int: Nombre d'éléments stockés ou mis à jour.
+        """
+        required_keys = ['model_name', 'link', 'content_type', 'platform', 'extraction_date']
+        # Un seul upsert par lien: seule la dernière occurrence d'un lien dans le lot est conservée
+        rows_by_link = {}
+        incomplete = 0
+        for item in content_items:
+            try:
+                row = self._content_row(item) if all(item.get(key) is not None for key in required_keys) else None
+            except Exception as e:
+                # Ex. métadonnées non sérialisables: seul cet élément est ignoré
+                logger.warning(f"Élément de contenu invalide ignoré: {item.get('link', 'Lien manquant')} ({e})")
+                row = None
+            if row is not None:
+                rows_by_link[item['link']] = row
+            else:
+                incomplete += 1
+        if incomplete:
+            logger.warning(f"{incomplete} éléments de contenu incomplets ou invalides ignorés")
+        if not rows_by_link:
+            return 0
+        rows = list(rows_by_link.values())
+
+        rebuild_indexes = len(rows) >= BULK_INDEX_REBUILD_THRESHOLD
+        try:
+            if rebuild_indexes:
+                # Suppression et reconstruction des index dans la transaction de l'upsert :
+                # si le lot échoue, le rollback rétablit aussi les index
+                if not self.conn.in_transaction:
+                    self.cursor.execute("BEGIN")
+                self._drop_content_indexes()
+            self.cursor.executemany(_SQL_UPSERT_CONTENT, rows)
+            if rebuild_indexes:
+                self._create_content_indexes()
+            self.conn.commit()
+            logger.debug(f"{len(rows)} éléments de contenu stockés/mis à jour en lot")
+            return len(rows)
+        except sqlite3.Error as e:
+            logger.error(f"Erreur SQLite lors du stockage en lot du contenu: {e}")
+            self.conn.rollback()
+            return 0
+        except Exception as e:
+            # Ex. OverflowError sur une valeur numérique hors limites: la transaction (et la
+            # suppression des index d'un chargement massif) ne doit pas rester ouverte
+            logger.exception(f"Erreur inattendue lors du stockage en lot du contenu: {e}")
+            self.conn.rollback()
+            return 0
+
+    @staticmethod
+    def _content_row(content_item: Dict[str, Any]) -> Optional[Tuple]:
+        """
+        Convertit un élément de contenu en paramètres d'insertion pour la table content.
+        
+        Retourne None si la date d'extraction est illisible : sans extraction_ts,
+        le contenu ne passerait jamais le filtre de récence de la sélection.
+        Les caractéristiques absentes et les métadonnées vides sont transmises à NULL
+        (inconnues) pour ne pas écraser les valeurs d'un contenu déjà stocké.
+        """
+        extraction_ts = _to_timestamp(content_item['extraction_date'])
+        if extraction_ts is None:
+            return None
+        metadata = content_item.get('metadata')
+        return (
+            content_item['model_name'],
+            content_item['link'],
+            content_item['content_type'],
+            content_item['platform'],
+            content_item['extraction_date'],
+            extraction_ts,
+            content_item.get('performance_metric'),
+            content_item.get('engagement_score'),
+            _flag(content_item.get('is_speaking')),
+            _flag(content_item.get('has_captions')),
+            _flag(content_item.get('has_music')),
+            _dump_metadata(metadata) if metadata else None
+        )
+
     def store_trend(self, trend_item: Dict[str, Any]) -> bool:
         """
         Stocke un élément de tendance dans la base de données.
@@ -214,32 +743,13 @@ class ContentSelector:
             return False
             
         item = trend_item['item']
-        platform = trend_item['platform']
-        content_type = trend_item['content_type']
-        extraction_date = trend_item.get('extraction_date', datetime.datetime.now().isoformat())
-        rank = trend_item.get('rank')
+        row = self._trend_row(trend_item)
         
-        logger.debug(f"Tentative de stockage de la tendance: {platform} - {content_type} - {item}")
+        logger.debug(f"Tentative de stockage de la tendance: {row[0]} - {row[1]} - {item}")
         
         try:
-            # Vérifier si la tendance existe déjà pour cette date (simpliste, pourrait être amélioré)
-            self.cursor.execute("SELECT id FROM trends WHERE platform = ? AND content_type = ? AND item = ? AND date(extraction_date) = date(?) ", 
-                              (platform, content_type, item, extraction_date))
-            existing = self.cursor.fetchone()
-            
-            if existing:
-                logger.debug(f"Tendance déjà existante pour aujourd'hui: {item}")
-                # Optionnel: Mettre à jour le rang si nécessaire
-                if rank is not None:
-                    self.cursor.execute("UPDATE trends SET rank = ? WHERE id = ?", (rank, existing[0]))
-            else:
-                logger.debug(f"Nouvelle tendance, insertion: {item}")
-                insert_query = '''
-                INSERT INTO trends (platform, content_type, item, rank, extraction_date)
-                VALUES (?, ?, ?, ?, ?)
-                '''
-                params = (platform, content_type, item, rank, extraction_date)
-                self.cursor.execute(insert_query, params)
+            # Insertion, ou mise à jour du rang si la tendance existe déjà pour ce jour
+            self.cursor.execute(_SQL_UPSERT_TREND, row)
                 
             self.conn.commit()
             logger.debug(f"Tendance stockée/mise à jour avec succès: {item}")
@@ -250,43 +760,168 @@ class ContentSelector:
             self.conn.rollback()
             return False
         except Exception as e:
-            logger.error(f"Erreur inattendue lors du stockage de la tendance {item}: {e}")
-            logger.error(traceback.format_exc())
+            logger.exception(f"Erreur inattendue lors du stockage de la tendance {item}: {e}")
             self.conn.rollback()
             return False
 
+    @staticmethod
+    def _trend_row(trend_item: Dict[str, Any]) -> Tuple:
+        """Convertit un élément de tendance en paramètres de _SQL_UPSERT_TREND."""
+        return (
+            trend_item['platform'],
+            trend_item['content_type'],
+            trend_item['item'],
+            trend_item.get('rank'),
+            trend_item['extraction_date']
+        )
+
+    def store_trends(self, trend_items: List[Dict[str, Any]]) -> int:
+        """
+        Stocke un lot de tendances dans une seule transaction.
+
+        Args:
+            trend_items (list): Liste de dictionnaires au format attendu par store_trend.
+
+        Returns:
+            int: Nombre de tendances stockées ou mises à jour.
+        """
+        required_keys = ['platform', 'content_type', 'item', 'extraction_date']
+        rows = [
+            self._trend_row(trend)
+            for trend in trend_items if all(trend.get(key) is not None for key in required_keys)
+        ]
+        if len(rows) < len(trend_items):
+            logger.warning(f"{len(trend_items) - len(rows)} tendances incomplètes ignorées")
+        if not rows:
+            return 0
+
+        try:
+            self.cursor.executemany(_SQL_UPSERT_TREND, rows)
+            self.conn.commit()
+            logger.debug(f"{len(rows)} tendances stockées/mises à jour en lot")
+            return len(rows)
+        except sqlite3.Error as e:
+            logger.error(f"Erreur SQLite lors du stockage en lot des tendances: {e}")
+            self.conn.rollback()
+            return 0
+
+    def _load_model_preferences(self, model_name: str) -> Dict[str, bool]:
+        """Lit les préférences d'un modèle dans la base de données (sans cache)."""
+        self.cursor.execute(_SQL_SELECT_PREFERENCES, (model_name,))
+        result = self.cursor.fetchone()
+        if result:
+            return {key: bool(result[key]) for key in ("prefers_speaking", "prefers_captions", "prefers_music")}
+        logger.warning(f"Préférences non trouvées pour le modèle: {model_name}")
+        return {}
+
     def _get_model_preferences(self, model_name: str) -> Dict[str, bool]:
-        """Récupère les préférences d'un modèle depuis la base de données."""
+        """Récupère les préférences d'un modèle (mises en cache après la première lecture)."""
         try:
-            self.cursor.execute("SELECT prefers_speaking, prefers_captions, prefers_music FROM model_preferences WHERE model_name = ?", (model_name,))
-            result = self.cursor.fetchone()
-            if result:
-                return {
-                    "prefers_speaking": bool(result[0]),
-                    "prefers_captions": bool(result[1]),
-                    "prefers_music": bool(result[2])
-                }
-            else:
-                logger.warning(f"Préférences non trouvées pour le modèle: {model_name}")
-                return {}
+            return self._preferences_cache(model_name)
         except sqlite3.Error as e:
             logger.error(f"Erreur SQLite lors de la récupération des préférences pour {model_name}: {e}")
             return {}
 
+    def _load_model_stats(self, model_name: str) -> Dict[str, float]:
+        """Lit les statistiques d'un modèle dans la base de données (sans cache)."""
+        self.cursor.execute(_SQL_SELECT_STATS, (model_name,))
+        result = self.cursor.fetchone()
+        if result:
+            return {"avg_reel_views": result["avg_reel_views"] if result["avg_reel_views"] is not None else 0}
+        logger.warning(f"Statistiques non trouvées pour le modèle: {model_name}")
+        return {"avg_reel_views": 0}
+
     def _get_model_stats(self, model_name: str) -> Dict[str, float]:
-        """Récupère les statistiques d'un modèle depuis la base de données."""
+        """Récupère les statistiques d'un modèle (mises en cache après la première lecture)."""
         try:
-            self.cursor.execute("SELECT avg_reel_views FROM model_stats WHERE model_name = ?", (model_name,))
-            result = self.cursor.fetchone()
-            if result:
-                return {"avg_reel_views": result[0] if result[0] is not None else 0}
-            else:
-                logger.warning(f"Statistiques non trouvées pour le modèle: {model_name}")
-                return {"avg_reel_views": 0}
+            return self._stats_cache(model_name)
         except sqlite3.Error as e:
             logger.error(f"Erreur SQLite lors de la récupération des statistiques pour {model_name}: {e}")
             return {"avg_reel_views": 0}
 
+    def clear_model_cache(self):
+        """Vide les caches des préférences et statistiques des modèles."""
+        self._preferences_cache.cache_clear()
+        self._stats_cache.cache_clear()
+
+    def update_model_preferences(self, preferences_by_model: Dict[str, Dict[str, bool]]) -> bool:
+        """
+        Enregistre les préférences de plusieurs modèles et invalide le cache.
+        
+        Args:
+            preferences_by_model (dict): Préférences ('prefers_speaking', 'prefers_captions',
+                                         'prefers_music') indexées par nom de modèle.
+                                         
+        Returns:
+            bool: True si la mise à jour a réussi, False sinon.
+        """
+        rows = [
+            (
+                model_name,
+                1 if preferences.get('prefers_speaking') else 0,
+                1 if preferences.get('prefers_captions') else 0,
+                1 if preferences.get('prefers_music') else 0
+            )
+            for model_name, preferences in preferences_by_model.items()
+        ]
+        try:
+            self.cursor.executemany(_SQL_UPSERT_PREFERENCES, rows)
+            self.conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Erreur SQLite lors de la mise à jour des préférences des modèles: {e}")
+            self.conn.rollback()
+            return False
+        finally:
+            self._preferences_cache.cache_clear()
+
+    def update_model_stats(self, avg_reel_views_by_model: Dict[str, float]) -> bool:
+        """
+        Enregistre les vues moyennes des reels de plusieurs modèles et invalide le cache.
+        
+        Args:
+            avg_reel_views_by_model (dict): Vues moyennes indexées par nom de modèle.
+            
+        Returns:
+            bool: True si la mise à jour a réussi, False sinon.
+        """
+        try:
+            self.cursor.executemany(_SQL_UPSERT_STATS, list(avg_reel_views_by_model.items()))
+            self.conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Erreur SQLite lors de la mise à jour des statistiques des modèles: {e}")
+            self.conn.rollback()
+            return False
+        finally:
+            self._stats_cache.cache_clear()
+
+    def mark_content_as_selected(self, content_ids: List[int]) -> bool:
+        """
+        Marque plusieurs contenus comme sélectionnés dans une seule transaction
+        (une requête par tranche de SQLITE_MAX_IN_PARAMS identifiants).
+        
+        Args:
+            content_ids (list): Identifiants des contenus à marquer.
+            
+        Returns:
+            bool: True si la mise à jour a réussi (ou s'il n'y avait rien à marquer), False sinon.
+        """
+        if not content_ids:
+            return True
+        selection_date = datetime.datetime.now().isoformat()
+        try:
+            for start in range(0, len(content_ids), SQLITE_MAX_IN_PARAMS):
+                chunk = content_ids[start:start + SQLITE_MAX_IN_PARAMS]
+                self.cursor.execute(_mark_selected_sql(len(chunk)), (selection_date, *chunk))
+            self.conn.commit()
+            logger.debug(f"{len(content_ids)} contenus marqués comme sélectionnés dans la DB")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Erreur SQLite lors du marquage de {len(content_ids)} contenus comme sélectionnés: {e}")
+            self.conn.rollback()
+            return False
+
     def select_content_for_model(self, model_name: str) -> List[Dict[str, Any]]:
         """
         Sélectionne le contenu pertinent pour un modèle spécifique.
@@ -299,102 +934,84 @@ class ContentSelector:
         """
         logger.info(f"Sélection du contenu pour le modèle: {model_name}")
         
-        preferences = self._get_model_preferences(model_name)
+        want_mask, must_not_mask = _preference_masks(self._get_model_preferences(model_name))
         stats = self._get_model_stats(model_name)
         avg_reel_views = stats.get("avg_reel_views", 0)
         
         selected_content = []
-        cutoff_date = (datetime.datetime.now() - datetime.timedelta(days=RECENCY_DAYS_LIMIT)).isoformat()
+        cutoff_ts = _to_timestamp(datetime.datetime.now() - datetime.timedelta(days=RECENCY_DAYS_LIMIT))
         
         try:
-            # Récupérer le contenu non sélectionné et récent pour ce modèle
-            query = '''
-            SELECT id, link, content_type, platform, performance_metric, engagement_score, 
-                   is_speaking, has_captions, has_music, metadata
-            FROM content 
-            WHERE model_name = ? AND selected = 0 AND extraction_date >= ?
-            '''
-            self.cursor.execute(query, (model_name, cutoff_date))
-            potential_content = self.cursor.fetchall()
+            # Les diagnostics par élément ne sont construits que si le niveau DEBUG est actif
+            debug_enabled = logger.isEnabledFor(logging.DEBUG)
+            evaluated = 0
             
-            logger.debug(f"{len(potential_content)} éléments de contenu potentiels trouvés pour {model_name}")
-            
-            for item in potential_content:
-                content_id, link, content_type, platform, performance, score, is_speaking, has_captions, has_music, metadata_json = item
-                metadata = json.loads(metadata_json) if metadata_json else {}
+            # Parcourir directement le curseur du contenu non sélectionné et récent pour ce modèle
+            with self._reader() as reader:
+                for item in reader.execute(_SQL_SELECT_CANDIDATES, (model_name, cutoff_ts)):
+                    evaluated += 1
+                    link = item["link"]
+                    content_type = item["content_type"]
+                    performance = item["performance_metric"]
+                    score = item["engagement_score"]
+                    is_speaking = item["is_speaking"]
+                    has_captions = item["has_captions"]
+                    has_music = item["has_music"]
                 
-                logger.debug(f"Évaluation du contenu: {link} (Type: {content_type}, Score: {score}, Perf: {performance})")
+                    if debug_enabled:
+                        logger.debug("Évaluation du contenu: %s (Type: %s, Score: %s, Perf: %s)", link, content_type, score, performance)
                 
-                # 1. Vérifier le score d'engagement minimum
-                if score is None or score < MIN_ENGAGEMENT_SCORE:
-                    logger.debug(f"  Rejeté: Score d'engagement ({score}) < {MIN_ENGAGEMENT_SCORE}")
-                    continue
-                    
-                # 2. Vérifier les vues minimales pour vidéos/reels
-                if content_type in ['video', 'reel'] and (performance is None or performance < MIN_VIEWS):
-                    logger.debug(f"  Rejeté: Vues ({performance}) < {MIN_VIEWS}")
-                    continue
+                    # 1. Vérifier le score d'engagement minimum
+                    if score is None or score < MIN_ENGAGEMENT_SCORE:
+                        if debug_enabled:
+                            logger.debug("  Rejeté: Score d'engagement (%s) < %s", score, MIN_ENGAGEMENT_SCORE)
+                        continue
                     
-                # 3. Vérifier la performance relative pour les reels (si applicable)
-                if content_type == 'reel' and avg_reel_views > 0 and performance is not None:
-                    relative_performance = performance / avg_reel_views
-                    if relative_performance < PERFORMANCE_THRESHOLD:
-                        logger.debug(f"  Rejeté: Performance relative du reel ({relative_performance:.2f}) < {PERFORMANCE_THRESHOLD}")
+                    # 2. Vérifier les vues minimales pour vidéos/reels
+                    if content_type in ['video', 'reel'] and (performance is None or performance < MIN_VIEWS):
+                        if debug_enabled:
+                            logger.debug("  Rejeté: Vues (%s) < %s", performance, MIN_VIEWS)
                         continue
-                    else:
-                        logger.debug(f"  Performance relative du reel: {relative_performance:.2f} (Seuil: {PERFORMANCE_THRESHOLD})")
-                
-                # 4. Vérifier la correspondance avec les préférences du modèle
-                preference_match = True
-                if preferences:
-                    # Si le modèle préfère parler et que le contenu ne parle pas
-                    if preferences.get('prefers_speaking') and not is_speaking:
-                        preference_match = False
-                        logger.debug("  Rejeté: Le modèle préfère parler, ce contenu ne parle pas.")
-                    # Si le modèle préfère les sous-titres et que le contenu n'en a pas
-                    elif preferences.get('prefers_captions') and not has_captions:
-                        preference_match = False
-                        logger.debug("  Rejeté: Le modèle préfère les sous-titres, ce contenu n'en a pas.")
-                    # Si le modèle préfère la musique et que le contenu n'en a pas
-                    elif preferences.get('prefers_music') and not has_music:
-                        preference_match = False
-                        logger.debug("  Rejeté: Le modèle préfère la musique, ce contenu n'en a pas.")
-                    # Si le modèle NE préfère PAS parler et que le contenu parle
-                    elif not preferences.get('prefers_speaking') and is_speaking:
-                        preference_match = False
-                        logger.debug("  Rejeté: Le modèle ne préfère pas parler, ce contenu parle.")
-                    # Si le modèle NE préfère PAS la musique et que le contenu en a
-                    elif not preferences.get('prefers_music') and has_music:
-                        preference_match = False
-                        logger.debug("  Rejeté: Le modèle ne préfère pas la musique, ce contenu en a.")
-                        
-                if not preference_match:
-                    continue
                     
-                # Si toutes les conditions sont remplies, sélectionner le contenu
-                logger.info(f"Contenu sélectionné pour {model_name}: {link}")
-                selected_content.append({
-                    "id": content_id,
-                    "link": link,
-                    "content_type": content_type,
-                    "platform": platform,
-                    "performance_metric": performance,
-                    "engagement_score": score,
-                    "is_speaking": bool(is_speaking),
-                    "has_captions": bool(has_captions),
-                    "has_music": bool(has_music),
-                    "metadata": metadata
-                })
+                    # 3. Vérifier la performance relative pour les reels (si applicable)
+                    if content_type == 'reel' and avg_reel_views > 0 and performance is not None:
+                        relative_performance = performance / avg_reel_views
+                        if relative_performance < PERFORMANCE_THRESHOLD:
+                            if debug_enabled:
+                                logger.debug("  Rejeté: Performance relative du reel (%.2f) < %s", relative_performance, PERFORMANCE_THRESHOLD)
+                            continue
+                        else:
+                            if debug_enabled:
+                                logger.debug("  Performance relative du reel: %.2f (Seuil: %s)", relative_performance, PERFORMANCE_THRESHOLD)
                 
-                # Marquer comme sélectionné dans la base de données
-                try:
-                    self.cursor.execute("UPDATE content SET selected = 1, selection_date = ? WHERE id = ?", 
-                                      (datetime.datetime.now().isoformat(), content_id))
-                    self.conn.commit()
-                    logger.debug(f"Contenu marqué comme sélectionné dans la DB: {link}")
-                except sqlite3.Error as e:
-                    logger.error(f"Erreur SQLite lors du marquage du contenu {link} comme sélectionné: {e}")
-                    self.conn.rollback()
+                    # 4. Vérifier la correspondance avec les préférences du modèle
+                    # (une caractéristique NULL, ex. lignes anciennes, compte comme absente)
+                    have = ((FLAG_SPEAKING if is_speaking else 0)
+                            | (FLAG_CAPTIONS if has_captions else 0)
+                            | (FLAG_MUSIC if has_music else 0))
+                    missing = want_mask & ~have
+                    forbidden = have & must_not_mask
+                    if missing or forbidden:
+                        if debug_enabled:
+                            logger.debug("  Rejeté: %s", _preference_rejection_reason(missing, forbidden))
+                        continue
+                    
+                    # Si toutes les conditions sont remplies, sélectionner le contenu
+                    logger.info("Contenu sélectionné pour %s: %s", model_name, link)
+                    metadata_json = item["metadata"]
+                    selected_content.append({
+                        **dict(item),
+                        "is_speaking": bool(is_speaking),
+                        "has_captions": bool(has_captions),
+                        "has_music": bool(has_music),
+                        "metadata": _load_metadata(metadata_json)
+                    })
+            
+            if debug_enabled:
+                logger.debug(f"{evaluated} éléments de contenu potentiels évalués pour {model_name}")
+            
+            # Marquer tout le contenu retenu comme sélectionné en une seule requête
+            self.mark_content_as_selected([item["id"] for item in selected_content])
             
             logger.info(f"{len(selected_content)} éléments sélectionnés pour {model_name}")
             return selected_content
@@ -403,25 +1020,55 @@ class ContentSelector:
             logger.error(f"Erreur SQLite lors de la sélection du contenu pour {model_name}: {e}")
             return []
         except Exception as e:
-            logger.error(f"Erreur inattendue lors de la sélection du contenu pour {model_name}: {e}")
-            logger.error(traceback.format_exc())
+            logger.exception(f"Erreur inattendue lors de la sélection du contenu pour {model_name}: {e}")
             return []
 
     def close(self):
-        """Ferme la connexion à la base de données."""
-        if self.conn:
+        """Libère la connexion à la base de données (rendue au pool si possible)."""
+        if not self.conn:
+            return
+        if self._pooled:
+            # Abandonner toute transaction en cours et rétablir les réglages par défaut
+            # avant de rendre la connexion
+            self.conn.rollback()
+            if self._pragma_overrides:
+                self._apply_pragmas({name: SQLITE_PRAGMAS[name] for name in self._pragma_overrides})
+            _release_connection(self._writer_pool, self.conn)
+            logger.info("Connexion à la base de données rendue au pool.")
+        else:
             self.conn.close()
             logger.info("Connexion à la base de données fermée.")
+        self.conn = None
 
 # Fonctions utilitaires pour interagir avec la classe ContentSelector
 
-def process_scraped_content(scraped_data: Dict[str, Any], model_names: List[str]) -> int:
+@contextlib.contextmanager
+def get_selector(selector: Optional[ContentSelector] = None):
+    """
+    Fournit un ContentSelector (connexion issue du pool) libéré à la sortie du bloc.
+    
+    Si un sélecteur est fourni, il est utilisé tel quel et reste ouvert.
+    """
+    if selector is not None:
+        yield selector
+        return
+    selector = ContentSelector()
+    try:
+        yield selector
+    finally:
+        selector.close()
+
+def process_scraped_content(scraped_data: Dict[str, Any], model_names: List[str],
+                            selector: Optional[ContentSelector] = None) -> int:
     """
     Traite les données scrapées et les stocke dans la base de données.
     
     Args:
         scraped_data (dict): Données brutes du scraper (doit contenir 'platform', 'username', 'posts').
+                             'posts' peut être une liste ou tout itérable (ex. générateur).
         model_names (list): Liste des noms de modèles associés à ces données.
+        selector (ContentSelector, optional): Connexion à réutiliser (sinon une connexion
+                                              temporaire est ouverte puis fermée).
         
     Returns:
         int: Nombre d'éléments de contenu stockés avec succès.
@@ -432,54 +1079,65 @@ def process_scraped_content(scraped_data: Dict[str, Any], model_names: List[str]
         
     platform = scraped_data.get('platform', 'inconnu')
     username = scraped_data.get('username', 'inconnu')
-    posts = scraped_data['posts']
+    if not model_names:
+        # Inutile d'ouvrir une connexion: aucun modèle auquel rattacher les posts
+        logger.warning(f"Aucun modèle associé aux posts de {username}, rien à stocker.")
+        return 0
+    posts: Iterable[Dict[str, Any]] = scraped_data['posts']
     count = 0
     
-    logger.debug(f"Traitement de {len(posts)} posts scrapés de {platform} pour {username} (Modèles: {', '.join(model_names)})")
+    logger.debug(f"Traitement des posts scrapés de {platform} pour {username} (Modèles: {', '.join(model_names)})")
     
-    selector = None
     try:
-        selector = ContentSelector()
-        for post in posts:
-            # Adapter les données du post au format attendu par store_content
-            content_item = {
-                "link": post.get('link'),
-                "content_type": post.get('type', 'inconnu'),
-                "platform": platform,
-                "extraction_date": post.get('timestamp', datetime.datetime.now().isoformat()),
-                "performance_metric": post.get('views') or post.get('likes'), # Priorité aux vues
-                "engagement_score": post.get('engagement_score'), # Assumer que le scraper le calcule
-                "is_speaking": post.get('is_speaking'),
-                "has_captions": post.get('has_captions'),
-                "has_music": post.get('has_music'),
-                "metadata": post.get('metadata', {})
-            }
-            
-            # Associer à tous les modèles concernés
-            for model_name in model_names:
-                content_item["model_name"] = model_name
-                if selector.store_content(content_item):
-                    count += 1
-                    # On ne compte qu'une fois même si stocké pour plusieurs modèles
-                    # (car store_content gère l'unicité par lien)
-                    break # Sortir de la boucle des modèles une fois stocké
+        with get_selector(selector) as selector:
+            # Le lien étant unique dans la table, chaque post est rattaché au premier modèle
+            # concerné (comme auparavant, où le stockage s'arrêtait au premier succès)
+            model_name = model_names[0]
+            # Valeurs par défaut calculées une seule fois pour tout le lot
+            now_iso = datetime.datetime.now().isoformat()
+            # Adapter les données des posts au format attendu par store_content_batch,
+            # en écrivant par lots pour ne pas garder tout le flux en mémoire
+            content_items = []
+            for post in posts:
+                get = post.get # Accès local à la méthode, évite sa résolution à chaque champ
+                content_items.append({
+                    "model_name": model_name,
+                    # Les scrapers fournissent 'url' et 'date' ('link'/'timestamp' acceptés aussi)
+                    "link": get('url') or get('link'),
+                    "content_type": get('type', 'inconnu'),
+                    "platform": platform,
+                    "extraction_date": get('date') or get('timestamp') or now_iso,
+                    "performance_metric": get('views') or get('likes'), # Priorité aux vues
+                    "engagement_score": get('engagement_score'), # Assumer que le scraper le calcule
+                    "is_speaking": get('is_speaking'),
+                    "has_captions": get('has_captions'),
+                    "has_music": get('has_music'),
+                    "metadata": get('metadata') or {
+                        key: value for key, value in post.items() if key not in POST_COLUMN_KEYS
+                    }
+                })
+                if len(content_items) >= SCRAPED_CONTENT_BATCH_SIZE:
+                    count += selector.store_content_batch(content_items)
+                    content_items = []
+            # Stocker les posts restants
+            if content_items:
+                count += selector.store_content_batch(content_items)
                     
     except Exception as e:
-        logger.error(f"Erreur lors du traitement des données scrapées pour {username}: {e}")
-        logger.error(traceback.format_exc())
-    finally:
-        if selector:
-            selector.close()
+        logger.exception(f"Erreur lors du traitement des données scrapées pour {username}: {e}")
             
     logger.debug(f"{count} éléments de contenu traités et potentiellement stockés pour {username}")
     return count
 
-def process_trending_content(trending_data: Dict[str, Any]) -> int:
+def process_trending_content(trending_data: Dict[str, Any],
+                             selector: Optional[ContentSelector] = None) -> int:
     """
     Traite les données de tendances et les stocke dans la base de données.
     
     Args:
         trending_data (dict): Données brutes des tendances (doit contenir 'platform', 'content_type', 'items').
+        selector (ContentSelector, optional): Connexion à réutiliser (sinon une connexion
+                                              temporaire est ouverte puis fermée).
         
     Returns:
         int: Nombre d'éléments de tendance stockés avec succès.
@@ -496,59 +1154,74 @@ def process_trending_content(trending_data: Dict[str, Any]) -> int:
     
     logger.debug(f"Traitement de {len(items)} tendances de type '{content_type}' pour {platform}")
     
-    selector = None
     try:
-        selector = ContentSelector()
-        for i, item_data in enumerate(items):
-            # Adapter les données au format attendu par store_trend
-            trend_item = {
+        # Adapter les données au format attendu par store_trends
+        trend_items = [
+            {
                 "platform": platform,
                 "content_type": content_type,
                 "item": item_data.get('name') if isinstance(item_data, dict) else item_data, # Nom du hashtag/son
                 "rank": item_data.get('rank', i + 1) if isinstance(item_data, dict) else i + 1,
                 "extraction_date": now
             }
-            if selector.store_trend(trend_item):
-                count += 1
+            for i, item_data in enumerate(items)
+        ]
+        with get_selector(selector) as selector:
+            count = selector.store_trends(trend_items)
                 
     except Exception as e:
-        logger.error(f"Erreur lors du traitement des données de tendance pour {platform}: {e}")
-        logger.error(traceback.format_exc())
-    finally:
-        if selector:
-            selector.close()
+        logger.exception(f"Erreur lors du traitement des données de tendance pour {platform}: {e}")
             
     logger.debug(f"{count} éléments de tendance traités et potentiellement stockés pour {platform}")
     return count
 
-def select_content_for_all_models(model_names: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+def select_content_for_all_models(model_names: List[str],
+                                  max_concurrent: int = MAX_SELECTION_WORKERS) -> Dict[str, List[Dict[str, Any]]]:
     """
     Sélectionne le contenu pertinent pour une liste de modèles.
     
     Args:
         model_names (list): Liste des noms de modèles.
+        max_concurrent (int): Nombre maximal de modèles traités en parallèle (1 = séquentiel).
         
     Returns:
         dict: Dictionnaire avec les noms de modèles comme clés et les listes de contenu sélectionné comme valeurs.
     """
     all_selected_content = {}
-    selector = None
+    # Un modèle en double serait traité en parallèle par deux threads (mêmes contenus
+    # distribués et marqués deux fois) : chaque modèle n'est traité qu'une fois, dans l'ordre
+    model_names = list(dict.fromkeys(model_names))
+    if not model_names:
+        return all_selected_content
+    
+    # Une connexion par thread (les connexions SQLite ne se partagent pas entre threads)
+    thread_state = threading.local()
+    selectors = []
+    
+    def _select_for_model(model_name):
+        selector = getattr(thread_state, "selector", None)
+        if selector is None:
+            selector = ContentSelector()
+            thread_state.selector = selector
+            selectors.append(selector)
+        return model_name, selector.select_content_for_model(model_name)
+    
     try:
-        selector = ContentSelector()
-        for model_name in model_names:
-            selected = selector.select_content_for_model(model_name)
-            all_selected_content[model_name] = selected
+        # Les lectures SQLite libèrent le GIL et le mode WAL autorise les lecteurs concurrents
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrent, len(model_names)))) as executor:
+            for model_name, selected in executor.map(_select_for_model, model_names):
+                all_selected_content[model_name] = selected
     except Exception as e:
-        logger.error(f"Erreur lors de la sélection du contenu pour tous les modèles: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception(f"Erreur lors de la sélection du contenu pour tous les modèles: {e}")
     finally:
-        if selector:
+        for selector in selectors:
             selector.close()
             
     return all_selected_content
 
 # Exemple d'utilisation (peut être exécuté pour tester le module)
 if __name__ == '__main__':
+    configure_logging()
     logger.info("Test du module ContentSelector...")
     
     # Initialiser
@@ -583,6 +1256,5 @@ if __name__ == '__main__':
         selector.close()
         
     except Exception as e:
-        logger.error(f"Erreur lors du test du module ContentSelector: {e}")
-        logger.error(traceback.format_exc())
+        logger.exception(f"Erreur lors du test du module ContentSelector: {e}")
 
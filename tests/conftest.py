@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Configuration commune des tests du module content_selector.
+"""
+
+import sys
+import types
+import pathlib
+import sqlite3
+
+import pytest
+
+ROOT_DIR = pathlib.Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+# ContentSelector lit la liste des modèles dans le script principal, qui importe Selenium
+# et les scrapers : sans ces dépendances, seule la liste MODELS est fournie aux tests.
+try:
+    import veille_automatisee  # noqa: F401
+except ImportError:
+    veille_automatisee = types.ModuleType("veille_automatisee")
+    veille_automatisee.MODELS = [{"name": "Talia"}, {"name": "Lina"}]
+    sys.modules["veille_automatisee"] = veille_automatisee
+
+import content_selector  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Chemin absolu d'une base SQLite temporaire, propre à chaque test."""
+    yield str(tmp_path.resolve() / "content_database.db")
+    content_selector.close_pooled_connections()
+
+
+@pytest.fixture
+def selector(db_path):
+    """ContentSelector ouvert sur la base temporaire (libéré en fin de test)."""
+    selector = content_selector.ContentSelector(db_path)
+    yield selector
+    selector.close()
+
+
+@pytest.fixture
+def raw_conn(db_path):
+    """Connexion SQLite directe, pour préparer ou vérifier les données hors du module."""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tests du stockage et de la sélection de contenu (base SQLite temporaire).
+"""
+
+import math
+import time
+import logging
+import pathlib
+import sqlite3
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import content_selector
+from content_selector import ContentSelector
+
+
+def make_content(link, **fields):
+    """Élément de contenu valide et récent, au format attendu par store_content."""
+    item = {
+        "model_name": "Talia",
+        "link": link,
+        "content_type": "photo",
+        "platform": "instagram",
+        "extraction_date": datetime.datetime.now().isoformat(),
+        "performance_metric": 100,
+        "engagement_score": 5.0,
+    }
+    item.update(fields)
+    return item
+
+
+def content_rows(conn):
+    """Lignes de la table content indexées par lien."""
+    return {row["link"]: row for row in conn.execute("SELECT * FROM content")}
+
+
+# --- Dates d'extraction illisibles ---
+
+def test_store_content_rejects_unparseable_date(selector, raw_conn):
+    assert selector.store_content(make_content("https://x/hier", extraction_date="hier")) is False
+    assert content_rows(raw_conn) == {}
+
+
+def test_store_content_batch_counts_unparseable_dates_as_incomplete(selector, raw_conn):
+    stored = selector.store_content_batch([
+        make_content("https://x/ok"),
+        make_content("https://x/hier", extraction_date="hier"),
+    ])
+    assert stored == 1
+    assert list(content_rows(raw_conn)) == ["https://x/ok"]
+    assert content_rows(raw_conn)["https://x/ok"]["extraction_ts"] is not None
+
+
+def test_unserializable_metadata_is_ignored_not_raised(selector, raw_conn):
+    circular = {}
+    circular["self"] = circular
+    assert selector.store_content(make_content("https://x/boucle", metadata=circular)) is False
+    assert selector.store_content_batch([
+        make_content("https://x/ok"),
+        make_content("https://x/boucle", metadata=circular),
+    ]) == 1
+    assert list(content_rows(raw_conn)) == ["https://x/ok"]
+
+
+def test_migration_backfills_unparseable_legacy_dates(db_path, raw_conn):
+    # Base antérieure à la colonne extraction_ts
+    raw_conn.execute('''
+    CREATE TABLE content (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, model_name TEXT NOT NULL, link TEXT UNIQUE NOT NULL,
+        content_type TEXT NOT NULL, platform TEXT NOT NULL, extraction_date TEXT NOT NULL,
+        performance_metric REAL, engagement_score REAL, is_speaking INTEGER, has_captions INTEGER,
+        has_music INTEGER, metadata TEXT, selected INTEGER DEFAULT 0, selection_date TEXT
+    )
+    ''')
+    raw_conn.executemany(
+        "INSERT INTO content (model_name, link, content_type, platform, extraction_date) VALUES (?, ?, ?, ?, ?)",
+        [("Talia", "https://x/iso", "photo", "instagram", "2026-01-02T03:04:05"),
+         ("Talia", "https://x/hier", "photo", "instagram", "hier")],
+    )
+    raw_conn.commit()
+
+    ContentSelector(db_path).close()
+
+    rows = content_rows(raw_conn)
+    assert rows["https://x/iso"]["extraction_ts"] == content_selector._to_timestamp("2026-01-02T03:04:05")
+    assert rows["https://x/hier"]["extraction_ts"] is not None
+
+
+# --- Chargement massif (suppression puis reconstruction des index) ---
+
+def content_indexes(conn):
+    return {row["name"] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'content'")}
+
+
+def test_bulk_batch_rebuilds_content_indexes(selector, raw_conn, monkeypatch):
+    monkeypatch.setattr(content_selector, "BULK_INDEX_REBUILD_THRESHOLD", 2)
+    stored = selector.store_content_batch([make_content(f"https://x/{i}") for i in range(3)])
+    assert stored == 3
+    assert set(content_selector.CONTENT_SECONDARY_INDEXES) <= content_indexes(raw_conn)
+
+
+def test_failing_bulk_batch_rolls_back_rows_and_index_drop(selector, raw_conn, monkeypatch):
+    monkeypatch.setattr(content_selector, "BULK_INDEX_REBUILD_THRESHOLD", 2)
+    raw_conn.execute('''
+    CREATE TRIGGER reject_bad_link BEFORE INSERT ON content
+    WHEN NEW.link = 'https://x/bad' BEGIN SELECT RAISE(ABORT, 'lien refusé'); END
+    ''')
+    raw_conn.commit()
+
+    stored = selector.store_content_batch([make_content("https://x/ok"), make_content("https://x/bad")])
+
+    assert stored == 0
+    assert content_rows(raw_conn) == {}
+    assert set(content_selector.CONTENT_SECONDARY_INDEXES) <= content_indexes(raw_conn)
+
+
+def test_bulk_batch_rolls_back_on_non_sqlite_error(selector, raw_conn, monkeypatch):
+    monkeypatch.setattr(content_selector, "BULK_INDEX_REBUILD_THRESHOLD", 2)
+
+    # 10**30 dépasse les entiers SQLite : OverflowError pendant executemany
+    stored = selector.store_content_batch([
+        make_content("https://x/1"), make_content("https://x/2"),
+        make_content("https://x/big", performance_metric=10**30),
+    ])
+
+    assert stored == 0
+    assert not selector.conn.in_transaction
+    assert selector.store_content(make_content("https://x/apres"))
+    assert list(content_rows(raw_conn)) == ["https://x/apres"]
+    assert set(content_selector.CONTENT_SECONDARY_INDEXES) <= content_indexes(raw_conn)
+
+
+def test_missing_index_is_restored_on_next_initialization(db_path, raw_conn):
+    ContentSelector(db_path).close()
+    content_selector.close_pooled_connections()
+    raw_conn.execute("DROP INDEX idx_content_model_selected_ts")
+    raw_conn.execute("DROP INDEX idx_trends_day")
+    raw_conn.commit()
+
+    ContentSelector(db_path).close()
+
+    indexes = {row["name"] for row in raw_conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_content_model_selected_ts", "idx_trends_day"} <= indexes
+
+
+# --- Sérialisation des métadonnées (json et orjson) ---
+
+@pytest.fixture(params=["json", "orjson"])
+def metadata_backend(request, monkeypatch):
+    """Exécute le test avec chaque bibliothèque JSON (orjson seulement si installé)."""
+    if request.param == "orjson":
+        monkeypatch.setattr(content_selector, "orjson", pytest.importorskip("orjson"))
+    else:
+        monkeypatch.setattr(content_selector, "orjson", None)
+    return request.param
+
+
+def test_metadata_round_trip(metadata_backend):
+    metadata = {"tags": ["été", "plage"], "likes": 12, "posted": datetime.datetime(2026, 1, 2, 3, 4, 5)}
+    dumped = content_selector._dump_metadata(metadata)
+    assert dumped == '{"tags":["été","plage"],"likes":12,"posted":"2026-01-02 03:04:05"}'
+    assert content_selector._load_metadata(dumped) == {**metadata, "posted": "2026-01-02 03:04:05"}
+
+
+def test_metadata_non_string_keys(metadata_backend):
+    assert content_selector._load_metadata(content_selector._dump_metadata({1: "a", None: "b"})) == {"1": "a", "null": "b"}
+
+
+def test_metadata_load_accepts_legacy_nan_and_ignores_garbage(metadata_backend):
+    assert math.isnan(content_selector._load_metadata('{"ratio":NaN}')["ratio"])
+    assert content_selector._load_metadata("{pas du json") == {}
+
+
+# --- Posts des scrapers ---
+
+def test_process_scraped_content_stores_scraper_posts(selector, raw_conn):
+    # Format produit par InstagramScraper (clés "url", "date" au format YYYY-MM-DD, "type")
+    scraped_data = {
+        "platform": "instagram",
+        "username": "talia",
+        "posts": [
+            {"type": "video", "url": "https://instagram.com/p/1", "media_url": "https://cdn/1.mp4",
+             "date": "2026-10-15", "days_ago": 1, "likes": 250, "comments": 12,
+             "caption": "Bonjour", "has_music": True, "has_captions": False,
+             "platform": "instagram", "username": "talia"},
+            {"type": "photo", "url": "https://instagram.com/p/2", "media_url": "https://cdn/2.jpg",
+             "date": "2026-10-14", "days_ago": 2, "likes": 40, "comments": 3,
+             "caption": "", "has_music": False, "has_captions": True,
+             "platform": "instagram", "username": "talia"},
+        ],
+    }
+
+    assert content_selector.process_scraped_content(scraped_data, ["Talia"], selector=selector) == 2
+
+    rows = content_rows(raw_conn)
+    video = rows["https://instagram.com/p/1"]
+    assert (video["model_name"], video["content_type"], video["platform"]) == ("Talia", "video", "instagram")
+    assert video["extraction_date"] == "2026-10-15"
+    assert video["extraction_ts"] == content_selector._to_timestamp("2026-10-15T00:00:00")
+    assert video["performance_metric"] == 250
+    assert (video["is_speaking"], video["has_captions"], video["has_music"]) == (0, 0, 1)
+    assert content_selector._load_metadata(video["metadata"]) == {
+        "media_url": "https://cdn/1.mp4", "days_ago": 1, "likes": 250, "comments": 12, "caption": "Bonjour",
+    }
+    assert rows["https://instagram.com/p/2"]["has_captions"] == 1
+
+
+# --- Initialisation concurrente ---
+
+def test_concurrent_first_instances_migrate_schema_once(db_path, raw_conn):
+    # Base au schéma initial (sans extraction_ts) : chaque instance voudrait la migrer
+    raw_conn.execute('''
+    CREATE TABLE content (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, model_name TEXT NOT NULL, link TEXT UNIQUE NOT NULL,
+        content_type TEXT NOT NULL, platform TEXT NOT NULL, extraction_date TEXT NOT NULL,
+        performance_metric REAL, engagement_score REAL, is_speaking INTEGER, has_captions INTEGER,
+        has_music INTEGER, metadata TEXT, selected INTEGER DEFAULT 0, selection_date TEXT
+    )
+    ''')
+    raw_conn.commit()
+    barrier = threading.Barrier(4)
+
+    def open_selector(_):
+        barrier.wait()
+        ContentSelector(db_path).close()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(open_selector, range(4)))
+
+    assert raw_conn.execute("PRAGMA user_version").fetchone()[0] == content_selector.SCHEMA_VERSION
+
+
+def test_process_scraped_content_keeps_scraper_post_type(selector, raw_conn):
+    scraped_data = {
+        "platform": "instagram",
+        "username": "talia",
+        "posts": [{"type": "carousel", "url": "https://instagram.com/p/3", "date": "2026-10-15", "likes": 10}],
+    }
+    assert content_selector.process_scraped_content(scraped_data, ["Talia"], selector=selector) == 1
+    assert content_rows(raw_conn)["https://instagram.com/p/3"]["content_type"] == "carousel"
+
+
+# --- Pools de connexions ---
+
+def test_relative_paths_share_pool(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    first = ContentSelector("content.db")
+    conn = first.conn
+    first.close()
+    second = ContentSelector("./content.db")
+    try:
+        assert second.db_path == str(tmp_path.resolve() / "content.db")
+        assert second.conn is conn
+    finally:
+        second.close()
+        content_selector.close_pooled_connections()
+
+
+def test_recreated_database_file_is_initialized_again(db_path):
+    ContentSelector(db_path).close()
+    for suffix in ("", "-wal", "-shm"):
+        pathlib.Path(db_path + suffix).unlink(missing_ok=True)
+
+    selector = ContentSelector(db_path)
+    try:
+        assert selector.store_content(make_content("https://x/apres"))
+    finally:
+        selector.close()
+
+
+def test_connection_closed_when_table_creation_fails(db_path, monkeypatch):
+    opened = []
+
+    def failing_create_tables(self):
+        opened.append(self.conn)
+        raise sqlite3.OperationalError("échec simulé")
+
+    monkeypatch.setattr(ContentSelector, "_create_tables", failing_create_tables)
+    with pytest.raises(sqlite3.OperationalError):
+        ContentSelector(db_path)
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].execute("SELECT 1")
+    assert content_selector._WRITER_POOLS[db_path].qsize() == 0
+
+
+def test_pools_are_bounded(db_path, monkeypatch):
+    monkeypatch.setattr(content_selector, "SQLITE_POOL_SIZE", 2)
+    selectors = [ContentSelector(db_path) for _ in range(4)]
+    for selector in selectors:
+        selector.close()
+    assert content_selector._WRITER_POOLS[db_path].qsize() == 2
+
+
+# --- Règles de fusion de l'upsert du contenu ---
+
+def test_upsert_keeps_known_values_when_new_ones_are_missing(selector, raw_conn):
+    selector.store_content(make_content(
+        "https://x/1", content_type="video", is_speaking=True, has_captions=True, has_music=True,
+        metadata={"caption": "Bonjour"},
+    ))
+    raw_conn.execute("UPDATE content SET selected = 1")
+    raw_conn.commit()
+
+    # Nouveau passage d'un scraper qui ne fournit ni caractéristiques ni métadonnées
+    assert selector.store_content(make_content(
+        "https://x/1", model_name="Lina", content_type="inconnu", engagement_score=9.0,
+    ))
+
+    row = content_rows(raw_conn)["https://x/1"]
+    assert (row["model_name"], row["content_type"], row["selected"]) == ("Talia", "video", 1)
+    assert row["engagement_score"] == 9.0
+    assert (row["is_speaking"], row["has_captions"], row["has_music"]) == (1, 1, 1)
+    assert content_selector._load_metadata(row["metadata"]) == {"caption": "Bonjour"}
+
+
+def test_upsert_applies_explicit_values(selector, raw_conn):
+    selector.store_content(make_content("https://x/1", is_speaking=True, has_music=True, metadata={"a": 1}))
+    selector.store_content_batch([make_content("https://x/1", is_speaking=False, metadata={"b": 2})])
+
+    row = content_rows(raw_conn)["https://x/1"]
+    assert (row["is_speaking"], row["has_captions"], row["has_music"]) == (0, 0, 1)
+    assert content_selector._load_metadata(row["metadata"]) == {"b": 2}
+
+
+def test_empty_metadata_encodings_do_not_overwrite(selector, raw_conn):
+    selector.store_content(make_content("https://x/1", metadata={"a": 1}))
+    for empty in ({}, [], None, ""):
+        selector.store_content(make_content("https://x/1", metadata=empty))
+    assert content_rows(raw_conn)["https://x/1"]["metadata"] == '{"a":1}'
+
+
+def test_insert_defaults_unknown_flags_and_metadata(selector, raw_conn):
+    selector.store_content(make_content("https://x/1"))
+    row = content_rows(raw_conn)["https://x/1"]
+    assert (row["is_speaking"], row["has_captions"], row["has_music"], row["metadata"]) == (0, 0, 0, "{}")
+
+
+# --- Réglages SQLite par instance ---
+
+@pytest.mark.parametrize("pragmas", [
+    {"journal_mode": "DELETE"},
+    {"page_size": 4096},
+    {"synchronous": "OFF; DROP TABLE content"},
+    {"cache_size": 1.5},
+])
+def test_invalid_pragma_overrides_are_rejected(db_path, pragmas):
+    with pytest.raises(ValueError):
+        ContentSelector(db_path, pragmas=pragmas)
+
+
+def test_pragma_overrides_are_restored_on_close(db_path):
+    selector = ContentSelector(db_path, pragmas={"synchronous": "OFF", "cache_size": -1024})
+    conn = selector.conn
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 0
+    selector.close()
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == content_selector.SQLITE_PRAGMAS["cache_size"]
+
+
+# --- Sélection et préférences des modèles ---
+
+def insert_raw_content(conn, link, is_speaking, has_captions, has_music, model_name="Talia"):
+    """Insère un contenu récent directement en SQL (ex. caractéristiques NULL d'anciennes lignes)."""
+    conn.execute(
+        "INSERT INTO content (model_name, link, content_type, platform, extraction_date, extraction_ts, "
+        "performance_metric, engagement_score, is_speaking, has_captions, has_music, metadata) "
+        "VALUES (?, ?, 'photo', 'instagram', ?, ?, 10, 5.0, ?, ?, ?, NULL)",
+        (model_name, link, datetime.datetime.now().isoformat(), int(time.time()), is_speaking, has_captions, has_music),
+    )
+    conn.commit()
+
+
+def test_selection_treats_null_flags_as_absent(selector, raw_conn):
+    insert_raw_content(raw_conn, "https://x/null", None, None, None)
+    insert_raw_content(raw_conn, "https://x/zero", 0, 0, 0)
+
+    selected = selector.select_content_for_model("Talia")
+
+    assert sorted(item["link"] for item in selected) == ["https://x/null", "https://x/zero"]
+    null_item = next(item for item in selected if item["link"] == "https://x/null")
+    assert (null_item["is_speaking"], null_item["has_captions"], null_item["has_music"]) == (False, False, False)
+    assert null_item["metadata"] == {}
+
+
+def test_selection_applies_preferences_and_logs_reason(selector, raw_conn, caplog):
+    selector.update_model_preferences({"Talia": {"prefers_captions": True}})
+    insert_raw_content(raw_conn, "https://x/null", None, None, None)
+    insert_raw_content(raw_conn, "https://x/captions", 0, 1, 0)
+    insert_raw_content(raw_conn, "https://x/music", 0, 1, 1)
+
+    with caplog.at_level(logging.DEBUG, logger="content_selector"):
+        selected = selector.select_content_for_model("Talia")
+
+    assert [item["link"] for item in selected] == ["https://x/captions"]
+    assert "Le modèle préfère les sous-titres, ce contenu n'en a pas." in caplog.text
+    assert "Le modèle ne préfère pas la musique, ce contenu en a." in caplog.text
+
+
+# --- Tendances (unicité par jour et migration du schéma v1) ---
+
+def make_trend(item, extraction_date, rank=None):
+    return {"platform": "tiktok", "content_type": "hashtag", "item": item, "rank": rank, "extraction_date": extraction_date}
+
+
+def trend_rows(conn):
+    return [tuple(row) for row in conn.execute("SELECT item, rank, extraction_date, date_bucket FROM trends ORDER BY id")]
+
+
+def test_same_day_trend_is_updated_not_duplicated(selector, raw_conn):
+    assert selector.store_trend(make_trend("#ete", "2026-10-15T08:00:00", rank=5))
+    assert selector.store_trends([make_trend("#ete", "2026-10-15T20:00:00", rank=2),
+                                  make_trend("#ete", "2026-10-16T08:00:00", rank=7)]) == 2
+    assert selector.store_trend(make_trend("#ete", "2026-10-15T21:00:00"))
+
+    assert trend_rows(raw_conn) == [
+        ("#ete", 2, "2026-10-15T08:00:00", "2026-10-15"),
+        ("#ete", 7, "2026-10-16T08:00:00", "2026-10-16"),
+    ]
+
+
+def test_trend_day_follows_utc_date_of_offset_timestamps(selector, raw_conn):
+    selector.store_trend(make_trend("#nuit", "2026-10-15T23:30:00-05:00", rank=1))
+    selector.store_trend(make_trend("#nuit", "2026-10-16T06:00:00", rank=3))
+    assert trend_rows(raw_conn) == [("#nuit", 3, "2026-10-15T23:30:00-05:00", "2026-10-16")]
+
+
+def test_migration_from_v1_keeps_latest_duplicate_trend(db_path, raw_conn):
+    # Schéma v1 : pas de date_bucket ni d'index unique, doublons possibles pour un même jour
+    raw_conn.execute('''
+    CREATE TABLE trends (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, platform TEXT NOT NULL, content_type TEXT NOT NULL,
+        item TEXT NOT NULL, rank INTEGER, extraction_date TEXT NOT NULL
+    )
+    ''')
+    raw_conn.execute("CREATE INDEX idx_trends_lookup ON trends (platform, content_type, item, extraction_date)")
+    raw_conn.executemany(
+        "INSERT INTO trends (platform, content_type, item, rank, extraction_date) VALUES ('tiktok', 'hashtag', ?, ?, ?)",
+        [("#ete", 4, "2026-10-15T08:00:00"), ("#ete", 1, "2026-10-15T20:00:00"),
+         ("#ete", 9, "2026-10-16T08:00:00"), ("#son", 2, "2026-10-15T08:00:00")],
+    )
+    raw_conn.execute("PRAGMA user_version = 1")
+    raw_conn.commit()
+
+    selector = ContentSelector(db_path)
+    try:
+        assert trend_rows(raw_conn) == [
+            ("#ete", 1, "2026-10-15T20:00:00", "2026-10-15"),
+            ("#ete", 9, "2026-10-16T08:00:00", "2026-10-16"),
+            ("#son", 2, "2026-10-15T08:00:00", "2026-10-15"),
+        ]
+        indexes = {row["name"] for row in raw_conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert "idx_trends_day" in indexes and "idx_trends_lookup" not in indexes
+        assert raw_conn.execute("PRAGMA user_version").fetchone()[0] == content_selector.SCHEMA_VERSION
+
+        assert selector.store_trend(make_trend("#ete", "2026-10-15T22:00:00", rank=3))
+        assert trend_rows(raw_conn)[0] == ("#ete", 3, "2026-10-15T20:00:00", "2026-10-15")
+    finally:
+        selector.close()
+
+
+def test_select_for_all_models_processes_duplicate_names_once(db_path, raw_conn, monkeypatch):
+    # select_content_for_all_models ouvre la base par défaut (DB_PATH, relative au dossier courant)
+    monkeypatch.chdir(pathlib.Path(db_path).parent)
+    ContentSelector(db_path).close()
+    for i in range(20):
+        insert_raw_content(raw_conn, f"https://x/{i}", 0, 0, 0)
+
+    result = content_selector.select_content_for_all_models(["Talia", "Talia", "Lina", "Talia"])
+
+    assert list(result) == ["Talia", "Lina"]
+    assert sorted(item["link"] for item in result["Talia"]) == sorted(f"https://x/{i}" for i in range(20))
+    assert result["Lina"] == []
+    assert raw_conn.execute("SELECT COUNT(*) FROM content WHERE selected = 1").fetchone()[0] == 20
@@ -25,7 +25,7 @@ from instagram_scraper import InstagramScraper, extract_instagram_content
 from twitter_scraper import TwitterScraper, extract_twitter_content
 from threads_scraper import ThreadsScraper, extract_threads_content
 from tiktok_scraper import TikTokScraper, extract_tiktok_content, get_tiktok_trending_hashtags, get_tiktok_trending_sounds
-from content_selector import ContentSelector, select_content_for_all_models, process_scraped_content, process_trending_content
+from content_selector import ContentSelector, get_selector, select_content_for_all_models, process_scraped_content, process_trending_content
 from google_sheet_integration import GoogleSheetIntegration
 
 # Configuration du logging
@@ -200,32 +200,13 @@ def update_model_preferences():
     try:
         selector = ContentSelector()
         
-        for model in MODELS:
-            model_name = model["name"]
-            preferences = model.get("preferences", {})
-            
-            # Construire les préférences
-            prefers_speaking = preferences.get("prefers_speaking", False)
-            prefers_captions = preferences.get("prefers_captions", False)
-            prefers_music = preferences.get("prefers_music", False)
-            
-            # Mettre à jour les préférences dans la base de données
-            selector.cursor.execute('''
-            UPDATE model_preferences SET 
-            prefers_speaking = ?,
-            prefers_captions = ?,
-            prefers_music = ?
-            WHERE model_name = ?
-            ''', (
-                1 if prefers_speaking else 0,
-                1 if prefers_captions else 0,
-                1 if prefers_music else 0,
-                model_name
-            ))
-        
-        selector.conn.commit()
+        # Mettre à jour les préférences dans la base de données (invalide le cache du sélecteur)
+        preferences_by_model = {model["name"]: model.get("preferences", {}) for model in MODELS}
+        updated = selector.update_model_preferences(preferences_by_model)
         selector.close()
         
+        if not updated:
+            return False
         logger.info("Préférences des modèles mises à jour avec succès.")
         return True
     except Exception as e:
@@ -237,20 +218,13 @@ def update_model_stats():
     try:
         selector = ContentSelector()
         
-        for model in MODELS:
-            model_name = model["name"]
-            avg_views = model.get("avg_views", 0)
-            
-            # Mettre à jour les statistiques dans la base de données
-            selector.cursor.execute('''
-            UPDATE model_stats SET 
-            avg_reel_views = ?
-            WHERE model_name = ?
-            ''', (avg_views, model_name))
-        
-        selector.conn.commit()
+        # Mettre à jour les statistiques dans la base de données (invalide le cache du sélecteur)
+        avg_views_by_model = {model["name"]: model.get("avg_views", 0) for model in MODELS}
+        updated = selector.update_model_stats(avg_views_by_model)
         selector.close()
         
+        if not updated:
+            return False
         logger.info("Statistiques des modèles mises à jour avec succès.")
         return True
     except Exception as e:
@@ -575,24 +549,26 @@ def run_trending_scraping():
     logger.info("Scraping des tendances...")
     
     try:
-        # TikTok
-        tiktok_hashtags = get_tiktok_trending_hashtags()
-        if tiktok_hashtags:
-            process_trending_content({
-                "platform": "tiktok",
-                "content_type": "hashtag",
-                "items": tiktok_hashtags
-            })
-        
-        tiktok_sounds = get_tiktok_trending_sounds()
-        if tiktok_sounds:
-            process_trending_content({
-                "platform": "tiktok",
-                "content_type": "sound",
-                "items": tiktok_sounds
-            })
-        
-        # Ajouter d'autres plateformes si nécessaire
+        # Une seule connexion partagée pour l'enregistrement des hashtags et des sons
+        with get_selector() as selector:
+            # TikTok
+            tiktok_hashtags = get_tiktok_trending_hashtags()
+            if tiktok_hashtags:
+                process_trending_content({
+                    "platform": "tiktok",
+                    "content_type": "hashtag",
+                    "items": tiktok_hashtags
+                }, selector=selector)
+            
+            tiktok_sounds = get_tiktok_trending_sounds()
+            if tiktok_sounds:
+                process_trending_content({
+                    "platform": "tiktok",
+                    "content_type": "sound",
+                    "items": tiktok_sounds
+                }, selector=selector)
+            
+            # Ajouter d'autres plateformes si nécessaire
         
         logger.info("Scraping des tendances terminé.")
     except Exception as e: